@@ -4,12 +4,19 @@ Features: Batch loading, upsert logic, error handling, transaction management
 Production-ready with comprehensive data validation and dependency management
 """
 import pandas as pd
+import csv
+import io
 import psycopg2
 import psycopg2.extras
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from psycopg2.extras import execute_values
 from sqlalchemy import create_engine, text
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timezone
@@ -23,6 +30,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Source columns each table load picks from the transformed DataFrame (in insert order)
+DETAILED_ARTIST_COLUMNS = ('artist_id', 'artist_name', 'artist_genres', 'artist_popularity', 'artist_followers')
+BASIC_ARTIST_COLUMNS = ('artist_id', 'artist_name')
+ALBUM_COLUMNS = ('album_id', 'album_name', 'artist_id', 'release_date', 'total_tracks', 'album_type')
+TRACK_COLUMNS = (
+    'track_id', 'track_name', 'album_id', 'artist_id',
+    'duration_ms', 'explicit', 'popularity', 'preview_url'
+)
+AUDIO_FEATURE_COLUMNS = (
+    'track_id', 'danceability', 'energy', 'key', 'loudness', 'mode',
+    'speechiness', 'acousticness', 'instrumentalness', 'liveness',
+    'valence', 'tempo', 'time_signature'
+)
+HISTORY_COLUMNS = ('track_id', 'played_at')
+# Audio features stored in INTEGER columns (NaN upcasts them to float upstream)
+AUDIO_FEATURE_INT_COLUMNS = ('key', 'mode', 'time_signature')
+
+# Columns written to listening_history (created_at is stamped by the loader)
+HISTORY_TABLE_COLUMNS = ('track_id', 'played_at', 'created_at')
+
+# load_complete_dataset_mp: tables loaded once up front vs per track shard (in FK order)
+DIMENSION_TABLES = ('artists', 'albums')
+TRACK_TABLES = ('tracks', 'audio_features', 'listening_history')
+
+# String placeholders that upstream serialization leaves behind for missing values
+NULL_STRINGS = ('NaT', 'None', 'nan', 'NaN', '')
+
+def available_columns(df: pd.DataFrame, columns: Tuple[str, ...]) -> List[str]:
+    """Columns of the allow-list present in df, in allow-list order (one set build, O(K+M))"""
+    present = set(df.columns)
+    return [col for col in columns if col in present]
+
+def first_rows_by_key(df: pd.DataFrame, key: str, columns: List[str]) -> pd.DataFrame:
+    """First row per key, restricted to columns (the dedupe mask hashes only the key column)"""
+    return df.loc[~df[key].duplicated(), columns]
+
+def genres_to_pg_array(genres: pd.Series) -> pd.Series:
+    """
+    Format genres (lists, comma-separated or "['a', 'b']" strings) as PostgreSQL
+    text[] literals like '{a,b}', with vectorized string ops; missing/empty -> None
+    """
+    kinds = genres.map(type)
+    formatted = pd.Series([None] * len(genres), index=genres.index, dtype=object)
+    
+    is_list = kinds.eq(list)
+    if is_list.any():
+        formatted[is_list] = '{' + genres[is_list].str.join(',') + '}'
+    
+    is_str = kinds.eq(str) & ~genres.isin(['', '[]'])
+    if is_str.any():
+        text = genres[is_str].astype(object)
+        # Handle stringified lists: remove brackets and quotes
+        bracketed = text.str.startswith('[') & text.str.endswith(']')
+        text = text.where(~bracketed, text.str[1:-1].str.replace("'", "", regex=False).str.replace('"', "", regex=False))
+        formatted[is_str] = '{' + text.str.replace(', ', ',', regex=False) + '}'
+    
+    return formatted
+
 class SpotifyDatabaseLoader:
     """Load transformed Spotify data into PostgreSQL database with enhanced batch processing"""
     
@@ -32,20 +97,16 @@ class SpotifyDatabaseLoader:
         self.connection = None
         # Add batch size configuration from new code
         self.batch_size = int(os.getenv('DB_BATCH_SIZE', '1000'))
-        self.connection_params = self._build_connection_params()  # For compatibility
+        # Loads at least this large are staged with COPY FROM STDIN instead of multi-row INSERTs
+        self.copy_threshold = int(os.getenv('DB_COPY_THRESHOLD', '5000'))
+        self._dataset_created_at = None  # Shared created_at while load_complete_dataset runs
+        # Whether listening_history has its (track_id, played_at) unique index; probed once
+        self._history_unique_key: Optional[bool] = None
+        # (table, columns, conflict, update) -> (VALUES upsert, staged upsert) SQL
+        self._upsert_sql_cache: Dict[tuple, Tuple[str, str]] = {}
         logger.info(f"🚀 SpotifyDatabaseLoader initialized with batch size: {self.batch_size}")
         self._setup_database()
     
-    def _build_connection_params(self) -> Dict[str, str]:
-        """Build connection parameters dictionary for compatibility"""
-        return {
-            'host': os.getenv('POSTGRES_HOST'),
-            'port': os.getenv('POSTGRES_PORT'),
-            'database': os.getenv('POSTGRES_DB'),
-            'user': os.getenv('POSTGRES_USER'),
-            'password': os.getenv('POSTGRES_PASSWORD')
-        }
-    
     def _build_connection_string(self) -> str:
         """Build database connection string"""
         host = os.getenv('POSTGRES_HOST')
@@ -54,7 +115,9 @@ class SpotifyDatabaseLoader:
         user = os.getenv('POSTGRES_USER')
         password = os.getenv('POSTGRES_PASSWORD')
         
-        return f"postgresql://{user}:{password}@{host}:{port}/{database}"
+        # Pin the psycopg2 driver: raw connections feed psycopg2.extras.execute_values, and
+        # SQLAlchemy 2.1 otherwise defaults postgresql:// to psycopg 3
+        return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
     
     def _setup_database(self):
         """Set up database connections"""
@@ -65,6 +128,12 @@ class SpotifyDatabaseLoader:
                 pool_size=10, 
                 max_overflow=20,
                 pool_pre_ping=True,  # Enable connection health checks
+                pool_recycle=1800,  # Replace connections before server/proxy idle timeouts drop them
+                # Engine-level executemany (e.g. pandas to_sql): INSERTs become multi-row VALUES
+                # pages, other statements use psycopg2's execute_batch
+                executemany_mode='values_plus_batch',
+                insertmanyvalues_page_size=self.batch_size,
+                executemany_batch_page_size=500,
                 echo=False  # Set to True for SQL debugging
             )
             
@@ -79,20 +148,62 @@ class SpotifyDatabaseLoader:
             raise
     
     def get_connection(self):
-        """Get raw psycopg2 connection for advanced operations"""
+        """
+        Get raw psycopg2 connection for advanced operations
+        
+        Checked out of the engine's pool, so no new TCP/TLS/auth handshake per load;
+        close() hands it back to the pool instead of disconnecting.
+        """
         try:
-            conn = psycopg2.connect(self.connection_string)
+            conn = self.engine.raw_connection()
             return conn
         except Exception as e:
             logger.error(f" Failed to get database connection: {e}")
             raise
     
-    def load_artists(self, df: pd.DataFrame) -> int:
+    def _created_at(self) -> datetime:
+        """created_at for the rows of one load: a single timestamp broadcast to every row,
+        shared by all tables within load_complete_dataset"""
+        return self._dataset_created_at or datetime.now(timezone.utc)
+    
+    @contextmanager
+    def _transaction(self, conn=None) -> Iterator:
+        """
+        Cursor for one load step
+        
+        Without conn the step gets its own connection, committed (or rolled back) on exit.
+        With a shared conn the step runs inside a savepoint: a failure only undoes this
+        step, and committing is left to the caller.
+        """
+        if conn is None:
+            conn = self.get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+            return
+        
+        with conn.cursor() as cursor:
+            cursor.execute("SAVEPOINT load_step")
+            try:
+                yield cursor
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT load_step")
+                raise
+            cursor.execute("RELEASE SAVEPOINT load_step")
+    
+    def load_artists(self, df: pd.DataFrame, conn=None) -> int:
         """
         Load artist data with enhanced upsert logic and batch processing
         
         Args:
             df: DataFrame with artist data
+            conn: Shared connection (see load_complete_dataset); one is opened if omitted
         
         Returns:
             Number of records loaded
@@ -105,16 +216,13 @@ class SpotifyDatabaseLoader:
         
         try:
             # Check if we have detailed artist information (from new extractor)
-            has_detailed_info = all(col in df.columns for col in ['artist_genres', 'artist_popularity', 'artist_followers'])
+            has_detailed_info = {'artist_genres', 'artist_popularity', 'artist_followers'}.issubset(df.columns)
             
             # Prepare artist data with available columns
             if has_detailed_info:
                 # Use detailed artist information
-                artist_columns = ['artist_id', 'artist_name', 'artist_genres', 'artist_popularity', 'artist_followers']
-                available_columns = [col for col in artist_columns if col in df.columns]
-                
                 # Get unique artists with detailed info
-                artists_df = df[available_columns].drop_duplicates(subset=['artist_id'])
+                artists_df = first_rows_by_key(df, 'artist_id', available_columns(df, DETAILED_ARTIST_COLUMNS))
                 artists_df = artists_df.rename(columns={
                     'artist_name': 'name',
                     'artist_genres': 'genres',
@@ -124,29 +232,13 @@ class SpotifyDatabaseLoader:
                 
                 # Enhanced genre processing - handle both list and string formats
                 if 'genres' in artists_df.columns:
-                    def process_genres(x):
-                        if pd.isna(x) or x == '' or x == '[]':
-                            return None
-                        if isinstance(x, list):
-                            return f"{{{','.join(x)}}}"
-                        elif isinstance(x, str):
-                            # Handle comma-separated string
-                            if x.startswith('[') and x.endswith(']'):
-                                # Remove brackets and process
-                                x = x[1:-1].replace("'", "").replace('"', '')
-                            return f"{{{x.replace(', ', ',')}}}"
-                        return None
-                    
-                    artists_df['genres'] = artists_df['genres'].apply(process_genres)
+                    artists_df['genres'] = genres_to_pg_array(artists_df['genres'])
                 
                 logger.info(f" Using detailed artist information (genres, popularity, followers)")
                 
             else:
                 # Use basic artist information
-                artist_columns = ['artist_id', 'artist_name']
-                available_columns = [col for col in artist_columns if col in df.columns]
-                
-                artists_df = df[available_columns].drop_duplicates(subset=['artist_id'])
+                artists_df = first_rows_by_key(df, 'artist_id', available_columns(df, BASIC_ARTIST_COLUMNS))
                 artists_df = artists_df.rename(columns={'artist_name': 'name'})
                 
                 # Add missing columns with defaults
@@ -165,112 +257,30 @@ class SpotifyDatabaseLoader:
                 artists_df['name'] = 'Unknown Artist'
             
             # Add timestamps
-            artists_df['created_at'] = datetime.now(timezone.utc)
-                
-            # Enhanced batch processing with execute_values for better performance
-            if len(artists_df) > self.batch_size:
-                logger.info(f"🔄 Processing {len(artists_df)} artists in batches of {self.batch_size}")
-                return self._load_artists_batch(artists_df, has_detailed_info)
-            else:
-                # Use existing upsert method for smaller datasets
-                update_columns = ['name', 'created_at']
-                if has_detailed_info:
-                    update_columns.extend(['genres', 'popularity', 'followers'])
-                
-                rows_affected = self._upsert_data(
-                    artists_df, 
-                    'artists', 
-                    conflict_columns=['artist_id'],
-                    update_columns=update_columns
-                )
-                
-                logger.info(f" Loaded {rows_affected} artists")
-                return rows_affected
+            artists_df['created_at'] = self._created_at()
                 
-        except Exception as e:
-            logger.error(f" Failed to load artists: {e}")
-            return 0
-            
-    def _load_artists_batch(self, artists_df: pd.DataFrame, has_detailed_info: bool) -> int:
-        """Load artists using batch processing with execute_values for better performance"""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            # Every load goes through _upsert_data: execute_values pages the rows itself
+            # (one multi-row INSERT per batch_size rows), or COPY stages large loads
+            update_columns = ['name', 'created_at']
+            if has_detailed_info:
+                update_columns.extend(['genres', 'popularity', 'followers'])
             
-            total_loaded = 0
+            rows_affected = self._upsert_data(
+                artists_df, 
+                'artists', 
+                conflict_columns=['artist_id'],
+                update_columns=update_columns,
+                conn=conn
+            )
             
-            # Process in batches
-            for i in range(0, len(artists_df), self.batch_size):
-                batch_df = artists_df.iloc[i:i + self.batch_size]
-                logger.info(f"📋 Processing batch {i//self.batch_size + 1}: {len(batch_df)} artists")
-                
-                # Prepare data for execute_values
-                data = []
-                for _, row in batch_df.iterrows():
-                    if has_detailed_info:
-                        values = (
-                            row.get('artist_id'),
-                            row.get('name', 'Unknown Artist'),
-                            row.get('genres'),
-                            row.get('popularity'),
-                            row.get('followers'),
-                            datetime.now(timezone.utc)
-                        )
-                    else:
-                        values = (
-                            row.get('artist_id'),
-                            row.get('name', 'Unknown Artist'),
-                            None,  # genres
-                            None,  # popularity
-                            None,  # followers
-                            datetime.now(timezone.utc)
-                        )
-                    data.append(values)
-                
-                # Enhanced upsert query with execute_values
-                if has_detailed_info:
-                    query = """
-                        INSERT INTO artists (artist_id, name, genres, popularity, followers, created_at)
-                        VALUES %s
-                        ON CONFLICT (artist_id) 
-                        DO UPDATE SET
-                            name = EXCLUDED.name,
-                            genres = EXCLUDED.genres,
-                            popularity = EXCLUDED.popularity,
-                            followers = EXCLUDED.followers,
-                            created_at = EXCLUDED.created_at
-                    """
-                else:
-                    query = """
-                        INSERT INTO artists (artist_id, name, genres, popularity, followers, created_at)
-                        VALUES %s
-                        ON CONFLICT (artist_id) 
-                        DO UPDATE SET
-                            name = EXCLUDED.name,
-                            created_at = EXCLUDED.created_at
-                    """
-                
-                execute_values(cursor, query, data)
-                batch_loaded = cursor.rowcount
-                total_loaded += batch_loaded
+            logger.info(f" Loaded {rows_affected} artists")
+            return rows_affected
                 
-                logger.info(f"    Batch {i//self.batch_size + 1}: {batch_loaded} artists loaded")
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            logger.info(f" Total artists loaded with batch processing: {total_loaded}")
-            return total_loaded
-            
         except Exception as e:
-            logger.error(f" Batch artist loading failed: {e}")
-            if 'conn' in locals():
-                conn.rollback()
-                conn.close()
+            logger.error(f" Failed to load artists: {e}")
             return 0
-    
-    def load_albums(self, df: pd.DataFrame) -> int:
+            
+    def load_albums(self, df: pd.DataFrame, conn=None) -> int:
         """Load album data with upsert logic"""
         if df.empty or 'album_id' not in df.columns:
             logger.warning("No album data to load")
@@ -280,25 +290,23 @@ class SpotifyDatabaseLoader:
         
         try:
             # Prepare album data
-            album_columns = ['album_id', 'album_name', 'artist_id', 'release_date', 'total_tracks', 'album_type']
-            available_columns = [col for col in album_columns if col in df.columns]
-            
             # Get unique albums
-            albums_df = df[available_columns].drop_duplicates(subset=['album_id'])
+            albums_df = first_rows_by_key(df, 'album_id', available_columns(df, ALBUM_COLUMNS))
             albums_df = albums_df.rename(columns={'album_name': 'name'})
             
             # Add missing columns with defaults
             if 'name' not in albums_df.columns:
                 albums_df['name'] = 'Unknown Album'
             
-            albums_df['created_at'] = datetime.now(timezone.utc)
+            albums_df['created_at'] = self._created_at()
             
             # Use upsert logic
             rows_affected = self._upsert_data(
                 albums_df,
                 'albums',
                 conflict_columns=['album_id'],
-                update_columns=['name', 'release_date', 'total_tracks', 'album_type', 'created_at']
+                update_columns=['name', 'release_date', 'total_tracks', 'album_type', 'created_at'],
+                conn=conn
             )
             
             logger.info(f" Loaded {rows_affected} albums")
@@ -308,7 +316,7 @@ class SpotifyDatabaseLoader:
             logger.error(f" Failed to load albums: {e}")
             return 0
     
-    def load_tracks(self, df: pd.DataFrame) -> int:
+    def load_tracks(self, df: pd.DataFrame, conn=None) -> int:
         """Load track data with upsert logic"""
         if df.empty or 'track_id' not in df.columns:
             logger.warning("No track data to load")
@@ -318,28 +326,23 @@ class SpotifyDatabaseLoader:
         
         try:
             # Prepare track data
-            track_columns = [
-                'track_id', 'track_name', 'album_id', 'artist_id', 
-                'duration_ms', 'explicit', 'popularity', 'preview_url'
-            ]
-            available_columns = [col for col in track_columns if col in df.columns]
-            
             # Get unique tracks
-            tracks_df = df[available_columns].drop_duplicates(subset=['track_id'])
+            tracks_df = first_rows_by_key(df, 'track_id', available_columns(df, TRACK_COLUMNS))
             tracks_df = tracks_df.rename(columns={'track_name': 'name'})
             
             # Add missing columns with defaults
             if 'name' not in tracks_df.columns:
                 tracks_df['name'] = 'Unknown Track'
             
-            tracks_df['created_at'] = datetime.now(timezone.utc)
+            tracks_df['created_at'] = self._created_at()
             
             # Use upsert logic
             rows_affected = self._upsert_data(
                 tracks_df,
                 'tracks',
                 conflict_columns=['track_id'],
-                update_columns=['name', 'duration_ms', 'explicit', 'popularity', 'preview_url', 'created_at']
+                update_columns=['name', 'duration_ms', 'explicit', 'popularity', 'preview_url', 'created_at'],
+                conn=conn
             )
             
             logger.info(f" Loaded {rows_affected} tracks")
@@ -349,7 +352,7 @@ class SpotifyDatabaseLoader:
             logger.error(f" Failed to load tracks: {e}")
             return 0
     
-    def load_audio_features(self, df: pd.DataFrame) -> int:
+    def load_audio_features(self, df: pd.DataFrame, conn=None) -> int:
         """Load audio features data"""
         if df.empty or 'track_id' not in df.columns:
             logger.warning("No audio features data to load")
@@ -359,28 +362,23 @@ class SpotifyDatabaseLoader:
         
         try:
             # Audio feature columns
-            feature_columns = [
-                'track_id', 'danceability', 'energy', 'key', 'loudness', 'mode',
-                'speechiness', 'acousticness', 'instrumentalness', 'liveness',
-                'valence', 'tempo', 'time_signature'
-            ]
-            
-            available_columns = [col for col in feature_columns if col in df.columns]
+            feature_columns = available_columns(df, AUDIO_FEATURE_COLUMNS)
             
-            if len(available_columns) < 2:  # At least track_id + 1 feature
+            if len(feature_columns) < 2:  # At least track_id + 1 feature
                 logger.warning("Insufficient audio features data")
                 return 0
             
             # Get unique audio features
-            features_df = df[available_columns].drop_duplicates(subset=['track_id'])
-            features_df['created_at'] = datetime.now(timezone.utc)
+            features_df = self._wire_feature_dtypes(first_rows_by_key(df, 'track_id', feature_columns))
+            features_df['created_at'] = self._created_at()
             
             # Use upsert logic
             rows_affected = self._upsert_data(
                 features_df,
                 'audio_features',
                 conflict_columns=['track_id'],
-                update_columns=[col for col in available_columns if col != 'track_id'] + ['created_at']
+                update_columns=[col for col in feature_columns if col != 'track_id'] + ['created_at'],
+                conn=conn
             )
             
             logger.info(f" Loaded {rows_affected} audio features")
@@ -390,7 +388,31 @@ class SpotifyDatabaseLoader:
             logger.error(f" Failed to load audio features: {e}")
             return 0
     
-    def load_listening_history(self, df: pd.DataFrame) -> int:
+    @staticmethod
+    def _wire_feature_dtypes(features_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Give audio feature columns the dtypes that serialize most compactly for the load
+        
+        Values go out as text literals (VALUES or CSV COPY) into FLOAT/INTEGER columns, so
+        the win is in the digits sent: integer features become nullable Int16 (sent as
+        '4', not '4.0'), and float32 features (the extractor's compact dtype) are widened
+        through their shortest float32 repr, so 0.123 is stored as 0.123 rather than
+        0.12300000339746475.
+        """
+        casts = {}
+        for col in features_df.columns:
+            if col in AUDIO_FEATURE_INT_COLUMNS and features_df[col].dtype.kind == 'f':
+                casts[col] = 'Int16'
+            elif features_df[col].dtype == 'float32':
+                casts[col] = features_df[col].to_numpy().astype(str).astype('float64')
+        for col, cast in casts.items():
+            try:
+                features_df[col] = features_df[col].astype(cast) if isinstance(cast, str) else cast
+            except (TypeError, ValueError):
+                pass  # e.g. a non-integral key: leave the column as-is
+        return features_df
+    
+    def load_listening_history(self, df: pd.DataFrame, conn=None) -> int:
         """Load listening history data"""
         if df.empty or 'track_id' not in df.columns or 'played_at' not in df.columns:
             logger.warning("No listening history data to load")
@@ -400,44 +422,48 @@ class SpotifyDatabaseLoader:
         
         try:
             # Prepare listening history data
-            history_columns = ['track_id', 'played_at']
-            available_columns = [col for col in history_columns if col in df.columns]
-            
-            history_df = df[available_columns].copy()
-            history_df['created_at'] = datetime.now(timezone.utc)
+            # assign() returns the new frame directly - no defensive copy of the selection first
+            history_df = df[available_columns(df, HISTORY_COLUMNS)].assign(created_at=self._created_at())
             
             # For listening history, we typically want to append new records
-            # Check for existing records to avoid duplicates
-            existing_check_query = """
-            SELECT COUNT(*) as count FROM listening_history 
-            WHERE track_id = %s AND played_at = %s
-            """
-            
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            new_records = []
-            for _, row in history_df.iterrows():
-                cursor.execute(existing_check_query, (row['track_id'], row['played_at']))
-                count = cursor.fetchone()[0]
+            # One set-based insert: plays already stored hit the (track_id, played_at)
+            # unique index and are skipped server-side instead of being checked row by row
+            on_conflict = "ON CONFLICT (track_id, played_at) DO NOTHING"
+            
+            with self._transaction(conn) as cursor:
+                if not self._has_history_unique_key(cursor):
+                    # Older schema without the unique index: dedupe client-side against
+                    # one IN-list fetch of the keys already stored, then a plain insert
+                    history_df = self._drop_existing_plays(cursor, history_df)
+                    on_conflict = ""
+                history_df = history_df[list(HISTORY_TABLE_COLUMNS)]
                 
-                if count == 0:  # Record doesn't exist
-                    new_records.append(row)
-            
-            cursor.close()
-            conn.close()
+                if history_df.empty:
+                    rows_affected = 0
+                elif len(history_df) >= self.copy_threshold:
+                    # Large loads: COPY into a staging table, then one set-based insert
+                    stage = self._copy_to_stage(cursor, 'listening_history', history_df)
+                    cursor.execute(f"""
+                    INSERT INTO listening_history (track_id, played_at, created_at)
+                    SELECT track_id, played_at, created_at FROM {stage}
+                    {on_conflict}
+                    """)
+                    rows_affected = cursor.rowcount
+                else:
+                    query = f"""
+                    INSERT INTO listening_history (track_id, played_at, created_at)
+                    VALUES %s
+                    {on_conflict}
+                    RETURNING 1
+                    """
+                    data = list(history_df.itertuples(index=False, name=None))
+                    # RETURNING counts inserted rows across every page (rowcount only covers the last one)
+                    rows_affected = len(execute_values(cursor, query, data, page_size=self.batch_size, fetch=True))
             
-            if new_records:
-                new_df = pd.DataFrame(new_records)
-                
-                # Insert new records using SQLAlchemy engine properly
-                rows_affected = len(new_df)
-                new_df.to_sql('listening_history', self.engine, if_exists='append', index=False, method='multi')
-                
+            if rows_affected:
                 logger.info(f" Loaded {rows_affected} new listening history records")
             else:
                 logger.info("No new listening history records to load")
-                rows_affected = 0
             
             return rows_affected
             
@@ -445,72 +471,208 @@ class SpotifyDatabaseLoader:
             logger.error(f" Failed to load listening history: {e}")
             return 0
     
+    def _has_history_unique_key(self, cursor) -> bool:
+        """Check (once per loader) that listening_history can take ON CONFLICT (track_id, played_at)"""
+        if self._history_unique_key is None:
+            cursor.execute("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_indexes
+                WHERE tablename = 'listening_history'
+                  AND indexname = 'uq_listening_history_track_played'
+            )
+            """)
+            self._history_unique_key = bool(cursor.fetchone()[0])
+            if not self._history_unique_key:
+                logger.warning("listening_history has no (track_id, played_at) unique index - "
+                               "deduping plays client-side; run sql/create_tables.sql to add it")
+        return self._history_unique_key
+    
+    @staticmethod
+    def _drop_existing_plays(cursor, history_df: pd.DataFrame) -> pd.DataFrame:
+        """Drop plays already stored, fetching every existing key in a single SELECT"""
+        history_df = history_df[~history_df.duplicated(['track_id', 'played_at'])]
+        played_at = pd.to_datetime(history_df['played_at'])
+        if played_at.dt.tz is not None:
+            # TIMESTAMP columns come back naive (UTC), so compare on naive UTC values
+            played_at = played_at.dt.tz_convert('UTC').dt.tz_localize(None)
+        keys = pd.MultiIndex.from_arrays([history_df['track_id'], played_at])
+        
+        cursor.execute(
+            "SELECT track_id, played_at FROM listening_history WHERE (track_id, played_at) IN %s",
+            (tuple(keys),)
+        )
+        existing = cursor.fetchall()
+        if not existing:
+            return history_df
+        return history_df[~keys.isin(pd.MultiIndex.from_tuples(existing))]
+    
     def _upsert_data(self, df: pd.DataFrame, table_name: str, 
-                    conflict_columns: List[str], update_columns: List[str]) -> int:
+                    conflict_columns: List[str], update_columns: List[str], conn=None) -> int:
         """Perform upsert (INSERT ... ON CONFLICT) operation"""
         if df.empty:
             return 0
         
-        conn = None
-        cursor = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Prepare column names and placeholders
-            columns = list(df.columns)
-            placeholders = ', '.join(['%s'] * len(columns))
-            columns_str = ', '.join(columns)
-            
-            # Build ON CONFLICT clause
-            conflict_str = ', '.join(conflict_columns)
-            update_clauses = [f"{col} = EXCLUDED.{col}" for col in update_columns]
-            update_str = ', '.join(update_clauses)
-            
-            # Build the upsert query
-            query = f"""
-            INSERT INTO {table_name} ({columns_str})
-            VALUES ({placeholders})
-            ON CONFLICT ({conflict_str})
-            DO UPDATE SET {update_str}
-            """
-            
-            # Execute batch insert with proper None handling
-            # Convert DataFrame rows to tuples, replacing string "NaT", "None", and empty strings with None
-            data_tuples = []
-            for row in df.values:
-                cleaned_row = []
-                for value in row:
-                    # Convert problematic string values to None (NULL in database)
-                    if value in ['NaT', 'None', 'nan', 'NaN', ''] or (isinstance(value, str) and value.strip() == ''):
-                        cleaned_row.append(None)
-                    # Handle pandas/numpy NaN and NaT
-                    elif pd.isna(value):
-                        cleaned_row.append(None)
-                    else:
-                        cleaned_row.append(value)
-                data_tuples.append(tuple(cleaned_row))
-            
-            cursor.executemany(query, data_tuples)
-            
-            rows_affected = cursor.rowcount
-            conn.commit()
+            # executemany-style last-write-wins: one VALUES list may not touch the same key twice
+            if len(conflict_columns) == 1:
+                duplicated = df[conflict_columns[0]].duplicated(keep='last')
+            else:
+                duplicated = df.duplicated(subset=conflict_columns, keep='last')
+            if duplicated.any():
+                df = df[~duplicated]
+            
+            query, staged_query = self._upsert_sql(table_name, tuple(df.columns),
+                                                   tuple(conflict_columns), tuple(update_columns))
+            
+            with self._transaction(conn) as cursor:
+                if len(df) >= self.copy_threshold:
+                    # Large loads: COPY into a staging table, then upsert from it in one statement
+                    self._copy_to_stage(cursor, table_name, df)
+                    cursor.execute(staged_query)
+                    rows_affected = cursor.rowcount
+                else:
+                    rows = self._to_db_rows(df)
+                    # RETURNING counts upserted rows across every page (rowcount only covers the last one)
+                    rows_affected = len(execute_values(cursor, query, rows, page_size=self.batch_size, fetch=True))
             
             return rows_affected
             
         except Exception as e:
             logger.error(f" Upsert failed for {table_name}: {e}")
-            if conn:
-                conn.rollback()
             return 0
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
     
-    def load_complete_dataset(self, df: pd.DataFrame) -> Dict[str, int]:
-        """Load complete dataset with proper order and dependencies"""
+    def _upsert_sql(self, table_name: str, columns: tuple, conflict_columns: tuple,
+                    update_columns: tuple) -> Tuple[str, str]:
+        """
+        Upsert statements for one table/column layout, built once and reused
+        
+        Returns the execute_values query (VALUES %s expands into one multi-row VALUES list
+        per page) and the INSERT ... SELECT used after a COPY into the staging table.
+        """
+        key = (table_name, columns, conflict_columns, update_columns)
+        cached = self._upsert_sql_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        columns_str = ', '.join(columns)
+        conflict_str = ', '.join(conflict_columns)
+        update_str = ', '.join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+        
+        query = f"""
+            INSERT INTO {table_name} ({columns_str})
+            VALUES %s
+            ON CONFLICT ({conflict_str})
+            DO UPDATE SET {update_str}
+            RETURNING 1
+            """
+        staged_query = f"""
+            INSERT INTO {table_name} ({columns_str})
+            SELECT {columns_str} FROM {self._stage_name(table_name)}
+            ON CONFLICT ({conflict_str})
+            DO UPDATE SET {update_str}
+            """
+        cached = self._upsert_sql_cache[key] = (query, staged_query)
+        return cached
+    
+    @staticmethod
+    def _stage_name(table_name: str) -> str:
+        """Name of the COPY staging table for table_name"""
+        return f"_stage_{table_name}"
+    
+    @classmethod
+    def _copy_to_stage(cls, cursor, table_name: str, df: pd.DataFrame) -> str:
+        """
+        Bulk-load df into a temporary copy of table_name's columns with COPY FROM STDIN
+        
+        The staging table takes the target's column types but no constraints or defaults,
+        and is dropped at commit. Returns its name.
+        """
+        stage = cls._stage_name(table_name)
+        columns_str = ', '.join(df.columns)
+        cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+        cursor.execute(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                       f"SELECT {columns_str} FROM {table_name} WITH NO DATA")
+        
+        try:
+            buffer = cls._arrow_csv(df)
+        except pa.ArrowException as e:
+            # Columns Arrow can't type (mixed Python objects): encode row by row instead
+            logger.debug(f"Arrow CSV encoding failed for {table_name} ({e}); using csv module")
+            buffer = cls._python_csv(cls._to_db_rows(df))
+        cursor.copy_expert(f"COPY {stage} ({columns_str}) FROM STDIN WITH (FORMAT csv)", buffer)
+        return stage
+    
+    @staticmethod
+    def _arrow_csv(df: pd.DataFrame) -> io.BytesIO:
+        """
+        df as headerless CSV for COPY, converted and written column-wise by pyarrow
+        
+        Same null rules as _to_db_rows: NaN/NaT, NULL_STRINGS and blank strings become
+        nulls, written as unquoted empty fields (NULL to COPY). Categoricals are decoded,
+        and integral floats are written without a fraction, so they parse as integers.
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        null_strings = pa.array(NULL_STRINGS)
+        for i, column in enumerate(table.columns):
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+            if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+                nulls = pc.or_(pc.is_in(column, value_set=null_strings.cast(column.type)),
+                               pc.equal(pc.utf8_trim_whitespace(column), ''))
+                column = pc.if_else(nulls, pa.scalar(None, column.type), column)
+            table = table.set_column(i, table.field(i).with_type(column.type), column)
+        
+        buffer = io.BytesIO()
+        pa_csv.write_csv(table, buffer, write_options=pa_csv.WriteOptions(include_header=False))
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def _python_csv(rows: List[tuple]) -> io.StringIO:
+        """Rows from _to_db_rows as CSV for COPY, with None as an unquoted empty field (NULL)"""
+        # Integral floats (integer columns upcast by NaN) are written as ints so they parse
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            tuple(int(value) if isinstance(value, float) and value.is_integer() else value for value in row)
+            for row in rows
+        )
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def _to_db_rows(df: pd.DataFrame) -> List[tuple]:
+        """
+        Rows as tuples of plain Python values with missing values as None (NULL)
+        
+        NaN/NaT and the string placeholders in NULL_STRINGS (or blank strings) become None.
+        Masks are built per column; itertuples then unboxes numpy scalars to Python ones.
+        """
+        values = df.astype(object)
+        nulls = values.isna()
+        for col in values.columns:
+            if df[col].dtype.kind in 'biufcmM':  # Numeric/datetime columns can't hold strings
+                continue
+            try:
+                blank = values[col].str.strip() == ''
+            except AttributeError:  # No strings in this column
+                continue
+            nulls[col] |= values[col].isin(NULL_STRINGS) | blank
+        
+        return list(values.mask(nulls, None).itertuples(index=False, name=None))
+    
+    def load_complete_dataset(self, df: pd.DataFrame, parallel: bool = False,
+                              tables: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        """
+        Load complete dataset with proper order and dependencies
+        
+        Args:
+            df: Transformed DataFrame
+            parallel: Commit artists/albums/tracks first, then load audio features and
+                listening history (which only depend on tracks) concurrently on their own
+                pooled connections. Faster, but the load is no longer one transaction.
+            tables: Only load these tables (still in dependency order); all by default
+        """
         logger.info("Starting complete dataset load...")
         
         results = {
@@ -525,23 +687,55 @@ class SpotifyDatabaseLoader:
             logger.warning("No data to load")
             return results
         
+        tables = set(tables or results)
+        self._dataset_created_at = datetime.now(timezone.utc)
         try:
-            # Load in proper order to respect foreign key constraints
-            
-            # 1. Load artists first (no dependencies)
-            results['artists'] = self.load_artists(df)
-            
-            # 2. Load albums (depends on artists)
-            results['albums'] = self.load_albums(df)
-            
-            # 3. Load tracks (depends on albums and artists)
-            results['tracks'] = self.load_tracks(df)
-            
-            # 4. Load audio features (depends on tracks)
-            results['audio_features'] = self.load_audio_features(df)
+            # One connection and one commit for all five loads; each load runs in its own
+            # savepoint, so a failed step is undone without losing the others
+            conn = self.get_connection()
+            try:
+                # Load in proper order to respect foreign key constraints
+                
+                # 1. Load artists first (no dependencies)
+                if 'artists' in tables:
+                    results['artists'] = self.load_artists(df, conn=conn)
+                
+                # 2. Load albums (depends on artists)
+                if 'albums' in tables:
+                    results['albums'] = self.load_albums(df, conn=conn)
+                
+                # 3. Load tracks (depends on albums and artists)
+                if 'tracks' in tables:
+                    results['tracks'] = self.load_tracks(df, conn=conn)
+                
+                if not parallel:
+                    # 4. Load audio features (depends on tracks)
+                    if 'audio_features' in tables:
+                        results['audio_features'] = self.load_audio_features(df, conn=conn)
+                    
+                    # 5. Load listening history (depends on tracks)
+                    if 'listening_history' in tables:
+                        results['listening_history'] = self.load_listening_history(df, conn=conn)
+                
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                results = dict.fromkeys(results, 0)  # Nothing was committed
+                raise
+            finally:
+                conn.close()
             
-            # 5. Load listening history (depends on tracks)
-            results['listening_history'] = self.load_listening_history(df)
+            if parallel:
+                # 4./5. Independent of each other: both only reference the committed tracks
+                with ThreadPoolExecutor(max_workers=2, thread_name_prefix='load') as executor:
+                    leaf_loads = {
+                        table: executor.submit(load, df)
+                        for table, load in (('audio_features', self.load_audio_features),
+                                            ('listening_history', self.load_listening_history))
+                        if table in tables
+                    }
+                    for table, future in leaf_loads.items():
+                        results[table] = future.result()
             
             total_rows = sum(results.values())
             logger.info(f" Complete dataset load finished: {total_rows} total rows loaded")
@@ -551,6 +745,34 @@ class SpotifyDatabaseLoader:
         except Exception as e:
             logger.error(f" Complete dataset load failed: {e}")
             return results
+        finally:
+            self._dataset_created_at = None
+    
+    def load_complete_dataset_mp(self, df: pd.DataFrame, workers: int = 4) -> Dict[str, int]:
+        """
+        Load a large dataset with the track-keyed tables sharded across worker processes
+        
+        Artists and albums are shared by many tracks, so they are loaded once here first.
+        Rows are then sharded by a stable hash of track_id, and each worker process
+        (with its own loader, engine and connection) loads tracks, audio features and
+        listening history for its shard. No track key lands in two shards, so the workers
+        never contend for the same rows.
+        """
+        results = self.load_complete_dataset(df, tables=DIMENSION_TABLES)
+        if df.empty or 'track_id' not in df.columns:
+            return results
+        
+        shard_of = pd.util.hash_pandas_object(df['track_id'], index=False).to_numpy() % workers
+        shards = [shard for shard in (df[shard_of == worker] for worker in range(workers)) if not shard.empty]
+        logger.info(f"🔀 Loading {len(df)} rows in {len(shards)} track shards across worker processes")
+        
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            for shard_results in executor.map(_load_track_shard, shards):
+                for table, count in shard_results.items():
+                    results[table] += count
+        
+        logger.info(f" Sharded dataset load finished: {sum(results.values())} total rows loaded")
+        return results
     
     def get_load_statistics(self) -> Dict[str, int]:
         """Get current table row counts"""
@@ -568,6 +790,25 @@ class SpotifyDatabaseLoader:
         except Exception as e:
             logger.error(f" Failed to get load statistics: {e}")
             return {}
+    
+    def get_max_played_at_ms(self) -> Optional[int]:
+        """Latest stored played_at as Unix milliseconds (UTC), or None when there is no history"""
+        try:
+            # MAX over the played_at index: an index-only lookup, not a scan
+            with self.engine.connect() as conn:
+                latest = conn.execute(text("SELECT MAX(played_at) FROM listening_history")).scalar()
+            if latest is None:
+                return None
+            # TIMESTAMP column holding UTC values: attach the zone before converting
+            return int(latest.replace(tzinfo=timezone.utc).timestamp() * 1000)
+            
+        except Exception as e:
+            logger.error(f" Failed to get latest played_at: {e}")
+            return None
+
+def _load_track_shard(shard: pd.DataFrame) -> Dict[str, int]:
+    """Worker-process entry point of load_complete_dataset_mp: load one track shard"""
+    return SpotifyDatabaseLoader().load_complete_dataset(shard, tables=TRACK_TABLES)
 
 # Alias for compatibility with new code
 DatabaseLoader = SpotifyDatabaseLoader
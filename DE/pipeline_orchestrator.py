@@ -2,12 +2,25 @@
 Day 3: ETL Pipeline Orchestrator
 Combines extraction, transformation, and loading with error handling and monitoring
 """
+import atexit
+import functools
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+import logging.handlers
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Mapping, Optional, Tuple
 import pandas as pd
 import sys
 from pathlib import Path
+from types import MappingProxyType
+
+# Copy-on-Write (always on from pandas 3): frames handed between stages share column data
+# until one is written, instead of each stage making defensive deep copies
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -17,17 +30,52 @@ from DE.extractors.spotify_extractor_v2 import SpotifyExtractorV2
 from DE.transformers.data_transformer import SpotifyDataTransformer
 from DE.loaders.database_loader import SpotifyDatabaseLoader
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/etl_pipeline.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: callers only enqueue records, a QueueListener thread does the
+# formatting and the file/console writes so pipeline stage threads never block on log I/O
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('logs/etl_pipeline.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Message (+ traceback) only; layout happens off-thread
+log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)  # Drains queued records before exit
+
 logger = logging.getLogger(__name__)
 
+# Route the pipeline's own loggers (DE.* components, plus this module when run as a script)
+# through the queue; root is left alone so a host application's handlers stay in place
+_pipeline_loggers = [logging.getLogger('DE')]
+if not __name__.startswith('DE.'):
+    _pipeline_loggers.append(logger)
+for _pipeline_logger in _pipeline_loggers:
+    _pipeline_logger.addHandler(_queue_handler)
+    _pipeline_logger.setLevel(logging.INFO)
+    _pipeline_logger.propagate = False  # Already written by the listener; don't repeat via root's handlers
+
+# Marks the end of the batch stream between streaming pipeline stages
+END_OF_STREAM = None
+
+# Monotonic clock for stage timings: an int read, no datetime/timedelta objects per capture
+_now_ns = time.perf_counter_ns
+
+@functools.lru_cache(maxsize=1)
+def _get_or_create_extractor() -> SpotifyExtractorV2:
+    """
+    Process-wide extractor shared by every pipeline instance
+    
+    Its OAuth token, user profile, HTTP pools and caches stay warm across runs instead of
+    being rebuilt (and the token re-fetched) by each SpotifyETLPipeline(). A failed setup
+    raises and is not cached.
+    """
+    return SpotifyExtractorV2()
+
 class SpotifyETLPipeline:
     """Complete ETL Pipeline for Spotify data"""
     
@@ -35,9 +83,19 @@ class SpotifyETLPipeline:
         self.extractor = None
         self.transformer = None
         self.loader = None
-        self.pipeline_stats = {
-            'start_time': None,
-            'end_time': None,
+        self.pipeline_stats = self._new_stats()
+        # Streaming stages update pipeline_stats from their own threads
+        self._stats_lock = threading.Lock()
+        
+        self._initialize_components()
+    
+    @staticmethod
+    def _new_stats() -> Dict:
+        """Empty pipeline_stats; each run starts a new dict so earlier results stay as they were"""
+        return {
+            'start_time': None,  # Wall-clock start, for display
+            'start_ns': None,
+            'end_ns': None,
             'duration_seconds': 0,
             'extraction_stats': {},
             'transformation_stats': {},
@@ -46,8 +104,6 @@ class SpotifyETLPipeline:
             'success': False,
             'errors': []
         }
-        
-        self._initialize_components()
     
     def _initialize_components(self):
         """Initialize ETL components"""
@@ -58,27 +114,27 @@ class SpotifyETLPipeline:
             logs_dir = Path('logs')
             logs_dir.mkdir(exist_ok=True)
             
-            self.extractor = SpotifyExtractorV2()
+            self.extractor = _get_or_create_extractor()
             self.transformer = SpotifyDataTransformer()
             self.loader = SpotifyDatabaseLoader()
             
             logger.info("✅ All ETL components initialized successfully")
             
         except Exception as e:
-            logger.error(f"❌ Failed to initialize ETL components: {e}")
+            logger.error("❌ Failed to initialize ETL components: %s", e)
             raise
     
     def extract_data(self, limit: int = 50, after_timestamp: Optional[int] = None) -> pd.DataFrame:
         """Extract data with error handling and monitoring"""
-        logger.info(f"📥 Starting data extraction (limit={limit})...")
+        logger.info("📥 Starting data extraction (limit=%d)...", limit)
         
         try:
-            self.pipeline_stats['extraction_stats']['start_time'] = datetime.utcnow()
+            self.pipeline_stats['extraction_stats']['start_ns'] = _now_ns()
             
             # Extract user info
-            user_info = self.extractor.extract_user_info()
+            user_info = self.extractor.user_info
             if user_info:
-                logger.info(f"👤 User: {user_info.get('display_name', 'Unknown')}")
+                logger.info("👤 User: %s", user_info.get('display_name', 'Unknown'))
             
             # Extract recent tracks with audio features
             df = self.extractor.extract_recent_tracks(limit=limit, after=after_timestamp)
@@ -91,28 +147,28 @@ class SpotifyETLPipeline:
             df = self.extractor.validate_data(df)
             
             self.pipeline_stats['extraction_stats'].update({
-                'end_time': datetime.utcnow(),
+                **self._stage_end('extraction_stats'),
                 'records_extracted': len(df),
                 'columns_extracted': len(df.columns),
                 'success': True
             })
             
-            logger.info(f"✅ Extraction complete: {len(df)} records, {len(df.columns)} columns")
+            logger.info("✅ Extraction complete: %d records, %d columns", len(df), len(df.columns))
             return df
             
         except Exception as e:
             error_msg = f"Data extraction failed: {e}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             self.pipeline_stats['errors'].append(error_msg)
             self.pipeline_stats['extraction_stats']['success'] = False
             return pd.DataFrame()
     
     def transform_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
         """Transform data with error handling and quality reporting"""
-        logger.info(f"🔄 Starting data transformation...")
+        logger.info("🔄 Starting data transformation...")
         
         try:
-            self.pipeline_stats['transformation_stats']['start_time'] = datetime.utcnow()
+            self.pipeline_stats['transformation_stats']['start_ns'] = _now_ns()
             
             if df.empty:
                 logger.warning("⚠️ No data to transform")
@@ -122,36 +178,36 @@ class SpotifyETLPipeline:
             transformed_df, quality_report = self.transformer.transform(df)
             
             self.pipeline_stats['transformation_stats'].update({
-                'end_time': datetime.utcnow(),
+                **self._stage_end('transformation_stats'),
                 'input_records': len(df),
                 'output_records': len(transformed_df),
                 'quality_report': quality_report,
                 'success': True
             })
             
-            logger.info(f"✅ Transformation complete: {len(df)} → {len(transformed_df)} records")
+            logger.info("✅ Transformation complete: %d → %d records", len(df), len(transformed_df))
             
-            # Log quality issues if any
-            if quality_report.get('missing_values'):
-                logger.info("📊 Data quality summary:")
+            # Per-column quality detail is debug output (the report is kept in transformation_stats)
+            if quality_report.get('missing_values') and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📊 Data quality summary:")
                 for col, info in quality_report['missing_values'].items():
-                    logger.info(f"  {col}: {info['percentage']:.1f}% missing")
+                    logger.debug("  %s: %.1f%% missing", col, info['percentage'])
             
             return transformed_df, quality_report
             
         except Exception as e:
             error_msg = f"Data transformation failed: {e}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             self.pipeline_stats['errors'].append(error_msg)
             self.pipeline_stats['transformation_stats']['success'] = False
             return pd.DataFrame(), {}
     
     def load_data(self, df: pd.DataFrame) -> Dict[str, int]:
         """Load data with error handling and monitoring"""
-        logger.info(f"📤 Starting data loading...")
+        logger.info("📤 Starting data loading...")
         
         try:
-            self.pipeline_stats['loading_stats']['start_time'] = datetime.utcnow()
+            self.pipeline_stats['loading_stats']['start_ns'] = _now_ns()
             
             if df.empty:
                 logger.warning("⚠️ No data to load")
@@ -163,32 +219,39 @@ class SpotifyETLPipeline:
             total_loaded = sum(loading_results.values())
             
             self.pipeline_stats['loading_stats'].update({
-                'end_time': datetime.utcnow(),
+                **self._stage_end('loading_stats'),
                 'records_loaded': total_loaded,
                 'loading_breakdown': loading_results,
                 'success': True
             })
             
-            logger.info(f"✅ Loading complete: {total_loaded} total records loaded")
-            logger.info("📊 Loading breakdown:")
-            for table, count in loading_results.items():
-                if count > 0:
-                    logger.info(f"  {table}: {count} records")
+            logger.info("✅ Loading complete: %d total records loaded", total_loaded)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📊 Loading breakdown:")
+                for table, count in loading_results.items():
+                    if count > 0:
+                        logger.debug("  %s: %d records", table, count)
             
             return loading_results
             
         except Exception as e:
             error_msg = f"Data loading failed: {e}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             self.pipeline_stats['errors'].append(error_msg)
             self.pipeline_stats['loading_stats']['success'] = False
             return {}
     
-    def run_pipeline(self, limit: int = 50, after_timestamp: Optional[int] = None) -> Dict:
-        """Run complete ETL pipeline"""
+    def run_pipeline(self, limit: int = 50, after_timestamp: Optional[int] = None,
+                     streaming: bool = False) -> Mapping:
+        """Run complete ETL pipeline (streaming=True overlaps the stages, see run_streaming_pipeline)"""
+        if streaming:
+            return self.run_streaming_pipeline(limit=limit, after_timestamp=after_timestamp)
+        
         logger.info("🚀 Starting complete ETL pipeline...")
         
+        self.pipeline_stats = self._new_stats()
         self.pipeline_stats['start_time'] = datetime.utcnow()
+        self.pipeline_stats['start_ns'] = _now_ns()
         
         try:
             # Step 1: Extract
@@ -216,37 +279,214 @@ class SpotifyETLPipeline:
             
         except Exception as e:
             error_msg = f"Pipeline execution failed: {e}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             self.pipeline_stats['errors'].append(error_msg)
             self.pipeline_stats['success'] = False
         
         return self._finalize_stats()
     
-    def _finalize_stats(self) -> Dict:
-        """Finalize pipeline statistics"""
-        self.pipeline_stats['end_time'] = datetime.utcnow()
+    def run_streaming_pipeline(self, limit: int = 50, after_timestamp: Optional[int] = None,
+                               queue_size: int = 2) -> Mapping:
+        """
+        Run the ETL pipeline with extract, transform and load overlapping
+        
+        Each stage runs on its own thread and hands page-sized batches to the next through
+        a bounded queue, so fetching one page from the API overlaps transforming and loading
+        the previous ones. queue_size caps how far a stage can run ahead of the next.
+        """
+        logger.info("🚀 Starting streaming ETL pipeline...")
+        
+        self.pipeline_stats = self._new_stats()
+        self.pipeline_stats['start_time'] = datetime.utcnow()
+        self.pipeline_stats['start_ns'] = _now_ns()
+        extract_q = queue.Queue(maxsize=queue_size)
+        load_q = queue.Queue(maxsize=queue_size)
+        cancelled = threading.Event()  # Set by a failed downstream stage so extraction stops early
         
-        if self.pipeline_stats['start_time']:
-            duration = self.pipeline_stats['end_time'] - self.pipeline_stats['start_time']
-            self.pipeline_stats['duration_seconds'] = duration.total_seconds()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix='etl-stage') as executor:
+            stages = [
+                executor.submit(self._extract_stage, extract_q, limit, after_timestamp, cancelled),
+                executor.submit(self._transform_stage, extract_q, load_q, cancelled),
+                executor.submit(self._load_stage, load_q, cancelled),
+            ]
+            for stage in stages:
+                stage.result()
         
-        return self.pipeline_stats.copy()
+        self.pipeline_stats['total_records_processed'] = \
+            self.pipeline_stats['transformation_stats'].get('output_records', 0)
+        self.pipeline_stats['success'] = not self.pipeline_stats['errors']
+        
+        if self.pipeline_stats['success']:
+            logger.info("🎉 Streaming ETL pipeline completed successfully!")
+        return self._finalize_stats()
+    
+    def iter_extract_data(self, limit: int = 50, after_timestamp: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Extract data as validated page-sized batches instead of one DataFrame
+        
+        Downstream stages can start on the first page while later ones are still being
+        fetched, and only the batches in flight are held in memory (nothing is concatenated).
+        Errors propagate to the caller.
+        """
+        logger.info("📥 Starting streamed data extraction (limit=%d)...", limit)
+        self._set_stats('extraction_stats', start_ns=_now_ns())
+        
+        user_info = self.extractor.user_info
+        if user_info:
+            logger.info("👤 User: %s", user_info.get('display_name', 'Unknown'))
+        
+        for batch in self.extractor.iter_recent_tracks(limit=limit, after=after_timestamp):
+            batch = self.extractor.validate_data(batch)
+            self._add_stats('extraction_stats', records_extracted=len(batch), batches=1)
+            self._set_stats('extraction_stats', columns_extracted=len(batch.columns))
+            yield batch
+        
+        self._set_stats('extraction_stats', success=True, **self._stage_end('extraction_stats'))
+    
+    def _extract_stage(self, out_q: queue.Queue, limit: int, after_timestamp: Optional[int],
+                       cancelled: threading.Event):
+        """Producer: push batches from iter_extract_data onto out_q, then END_OF_STREAM"""
+        try:
+            for batch in self.iter_extract_data(limit=limit, after_timestamp=after_timestamp):
+                if cancelled.is_set():
+                    break  # A later stage failed; stop fetching pages nobody will load
+                out_q.put(batch)
+        except Exception as e:
+            self._record_stage_error('extraction_stats', f"Data extraction failed: {e}")
+        finally:
+            out_q.put(END_OF_STREAM)
+    
+    def _transform_stage(self, in_q: queue.Queue, out_q: queue.Queue, cancelled: threading.Event):
+        """Transform each batch from in_q onto out_q; a failed batch is recorded and skipped"""
+        upstream_done = False
+        try:
+            self._set_stats('transformation_stats', start_ns=_now_ns())
+            while True:
+                batch = in_q.get()
+                if batch is END_OF_STREAM:
+                    upstream_done = True
+                    break
+                try:
+                    transformed_df, _ = self.transformer.transform(batch)
+                except Exception as e:
+                    self._record_stage_error('transformation_stats', f"Data transformation failed: {e}")
+                    continue
+                self._add_stats('transformation_stats', input_records=len(batch),
+                                output_records=len(transformed_df))
+                if not transformed_df.empty:
+                    out_q.put(transformed_df)
+            self._set_stats('transformation_stats', success=True, **self._stage_end('transformation_stats'))
+        except Exception as e:
+            cancelled.set()
+            self._record_stage_error('transformation_stats', f"Transformation stage failed: {e}")
+        finally:
+            out_q.put(END_OF_STREAM)
+            if not upstream_done:
+                self._drain(in_q)
+    
+    def _load_stage(self, in_q: queue.Queue, cancelled: threading.Event):
+        """Consumer: load each batch from in_q until END_OF_STREAM"""
+        upstream_done = False
+        try:
+            self._set_stats('loading_stats', start_ns=_now_ns())
+            while True:
+                batch = in_q.get()
+                if batch is END_OF_STREAM:
+                    upstream_done = True
+                    break
+                try:
+                    loading_results = self.loader.load_complete_dataset(batch)
+                except Exception as e:
+                    self._record_stage_error('loading_stats', f"Data loading failed: {e}")
+                    continue
+                self._add_stats('loading_stats', records_loaded=sum(loading_results.values()),
+                                loading_breakdown=loading_results)
+            self._set_stats('loading_stats', success=True, **self._stage_end('loading_stats'))
+        except Exception as e:
+            cancelled.set()
+            self._record_stage_error('loading_stats', f"Loading stage failed: {e}")
+        finally:
+            if not upstream_done:
+                self._drain(in_q)
+    
+    @staticmethod
+    def _drain(in_q: queue.Queue):
+        """Discard batches until END_OF_STREAM so the upstream stage never blocks on a full queue"""
+        while in_q.get() is not END_OF_STREAM:
+            pass
+    
+    def _add_stats(self, section: str, **counts):
+        """Add per-batch counts (numbers, or dicts of numbers) into pipeline_stats[section]"""
+        with self._stats_lock:
+            stats = self.pipeline_stats[section]
+            for key, value in counts.items():
+                if isinstance(value, dict):
+                    totals = stats.setdefault(key, {})
+                    for name, count in value.items():
+                        totals[name] = totals.get(name, 0) + count
+                else:
+                    stats[key] = stats.get(key, 0) + value
+    
+    def _set_stats(self, section: str, **values):
+        """Set pipeline_stats[section] values; success=True never clears an earlier failure"""
+        with self._stats_lock:
+            stats = self.pipeline_stats[section]
+            if stats.get('success') is False:
+                values.pop('success', None)
+            stats.update(values)
+    
+    def _record_stage_error(self, section: str, error_msg: str):
+        """Log a stage failure and mark the stage unsuccessful"""
+        logger.error("❌ %s", error_msg)
+        with self._stats_lock:
+            self.pipeline_stats['errors'].append(error_msg)
+            self.pipeline_stats[section]['success'] = False
+    
+    def _stage_end(self, section: str) -> Dict:
+        """end_ns and duration_seconds for a stage whose start_ns is already recorded"""
+        end_ns = _now_ns()
+        return {'end_ns': end_ns, 'duration_seconds': (end_ns - self.pipeline_stats[section]['start_ns']) / 1e9}
+    
+    def _finalize_stats(self) -> Mapping:
+        """
+        Finalize pipeline statistics
+        
+        Returns a read-only view of pipeline_stats rather than a copy; callers that need
+        to modify the result should take dict(result). Each run starts a new pipeline_stats
+        dict, so a view returned by an earlier run keeps that run's values.
+        """
+        self.pipeline_stats['end_ns'] = _now_ns()
+        
+        if self.pipeline_stats['start_ns'] is not None:
+            duration_ns = self.pipeline_stats['end_ns'] - self.pipeline_stats['start_ns']
+            self.pipeline_stats['duration_seconds'] = duration_ns / 1e9
+        
+        return MappingProxyType(self.pipeline_stats)
     
     def get_database_summary(self) -> Dict:
         """Get summary of current database state"""
         try:
             return self.loader.get_load_statistics()
         except Exception as e:
-            logger.error(f"❌ Failed to get database summary: {e}")
+            logger.error("❌ Failed to get database summary: %s", e)
             return {}
     
-    def run_incremental_pipeline(self, hours_back: int = 1) -> Dict:
-        """Run pipeline for incremental updates"""
-        logger.info(f"🔄 Running incremental pipeline (last {hours_back} hours)...")
+    def run_incremental_pipeline(self, hours_back: int = 1) -> Mapping:
+        """
+        Run pipeline for incremental updates
+        
+        Resumes from the latest play already stored, so Spotify's server-side 'after'
+        cursor returns only new plays; hours_back is the window used while the history
+        table is still empty (or cannot be read).
+        """
+        after_timestamp = self.loader.get_max_played_at_ms()  # Spotify uses milliseconds
         
-        # Calculate timestamp for incremental load
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours_back)
-        after_timestamp = int(cutoff_time.timestamp() * 1000)  # Spotify uses milliseconds
+        if after_timestamp is not None:
+            logger.info("🔄 Running incremental pipeline (plays after the last stored one)...")
+        else:
+            logger.info("🔄 Running incremental pipeline (last %d hours)...", hours_back)
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours_back)
+            after_timestamp = int(cutoff_time.timestamp() * 1000)
         
         return self.run_pipeline(limit=50, after_timestamp=after_timestamp)
 
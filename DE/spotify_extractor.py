@@ -5,25 +5,76 @@ Simple version to test API functionality
 import os
 from dotenv import load_dotenv
 import spotipy
+from spotipy.cache_handler import CacheFileHandler
 from spotipy.oauth2 import SpotifyOAuth
 import pandas as pd
 from datetime import datetime
+from operator import itemgetter
 import certifi
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
 
+# Stable token cache shared by every run, so a valid or refreshable token skips the OAuth flow
+TOKEN_CACHE_PATH = os.getenv('SPOTIFY_TOKEN_CACHE_PATH', '.spotify_token_cache')
+
+# Fields pulled from each track object in one C-level call
+TRACK_FIELDS = ('track_id', 'track_name', 'duration_ms', 'popularity', 'explicit')
+get_track_fields = itemgetter('id', 'name', 'duration_ms', 'popularity', 'explicit')
+get_id_and_name = itemgetter('id', 'name')
+
+# Column order of the recent tracks DataFrame
+COLUMNS = ['track_id', 'track_name', 'artist_name', 'artist_id', 'album_name', 'album_id',
+           'played_at', 'duration_ms', 'popularity', 'explicit']
+# Numeric columns get explicit dtypes instead of pandas' row-by-row inference
+COLUMN_DTYPES = {'duration_ms': 'int32', 'popularity': 'int16', 'explicit': 'bool'}
+
+def build_tracks_df(items):
+    """Flatten recently played items into a DataFrame, built one column list at a time"""
+    cols = {name: [] for name in COLUMNS}
+    track_cols = [cols[name].append for name in TRACK_FIELDS]
+    for item in items:
+        track = item['track']
+        for append, value in zip(track_cols, get_track_fields(track)):
+            append(value)
+        artist_id, artist_name = get_id_and_name(track['artists'][0])
+        album_id, album_name = get_id_and_name(track['album'])
+        cols['artist_id'].append(artist_id)
+        cols['artist_name'].append(artist_name)
+        cols['album_id'].append(album_id)
+        cols['album_name'].append(album_name)
+        cols['played_at'].append(item['played_at'])
+    df = pd.DataFrame(cols).astype(COLUMN_DTYPES)
+    # ISO 8601 fast path (with or without milliseconds) instead of per-row format inference;
+    # cache=True parses each distinct timestamp string once
+    df['played_at'] = pd.to_datetime(df['played_at'], format='ISO8601', utc=True, cache=True, errors='coerce')
+    return df
+
+def build_session():
+    """Keep-alive session shared by the OAuth and API calls, so requests reuse TCP+TLS connections"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    session.verify = certifi.where()
+    return session
+
 def get_spotify_client():
     """Create authenticated Spotify client"""
     try:
+        session = build_session()
         sp = spotipy.Spotify(
             auth_manager=SpotifyOAuth(
                 client_id=os.getenv('SPOTIPY_CLIENT_ID'),
                 client_secret=os.getenv('SPOTIPY_CLIENT_SECRET'),
                 redirect_uri=os.getenv('SPOTIPY_REDIRECT_URI'),
                 scope="user-read-recently-played",
-            )
+                cache_handler=CacheFileHandler(cache_path=TOKEN_CACHE_PATH),
+                requests_session=session,
+            ),
+            requests_session=session,
         )
         return sp
     except Exception as e:
@@ -36,37 +87,28 @@ def get_recent_tracks(sp, limit=20):
         print(f"🎵 Getting {limit} recent tracks...")
         results = sp.current_user_recently_played(limit=limit)
         
-        tracks_data = []
-        for item in results['items']:
-            track = item['track']
-            played_at = item['played_at']
-            
-            track_info = {
-                'track_id': track['id'],
-                'track_name': track['name'],
-                'artist_name': track['artists'][0]['name'],
-                'artist_id': track['artists'][0]['id'],
-                'album_name': track['album']['name'],
-                'album_id': track['album']['id'],
-                'played_at': played_at,
-                'duration_ms': track['duration_ms'],
-                'popularity': track['popularity'],
-                'explicit': track['explicit']
-            }
-            tracks_data.append(track_info)
-        
-        df = pd.DataFrame(tracks_data)
-        print(f"✅ Retrieved {len(tracks_data)} tracks")
+        df = build_tracks_df(results['items'])
+        print(f"✅ Retrieved {len(df)} tracks")
         return df
         
     except Exception as e:
         print(f"❌ Failed to get recent tracks: {e}")
         return None
 
+def write_tracks(df, filename):
+    """Write df in the format named by the file extension: .parquet, .feather, anything else CSV"""
+    if filename.endswith('.parquet'):
+        # Columnar, compressed and dtype-preserving - much faster than CSV's per-cell str conversion
+        df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+    elif filename.endswith('.feather'):
+        df.to_feather(filename)
+    else:
+        df.to_csv(filename, index=False)
+
 def save_to_csv(df, filename="recent_tracks.csv"):
-    """Save DataFrame to CSV file"""
+    """Save DataFrame to a file (CSV, or Parquet/Feather by extension)"""
     if df is not None and not df.empty:
-        df.to_csv(filename, index=False)
+        write_tracks(df, filename)
         print(f"✅ Saved {len(df)} tracks to {filename}")
         return True
     else:
@@ -89,8 +131,8 @@ def main():
     if df is None:
         return False
     
-    # Save to CSV
-    success = save_to_csv(df, "day2_test_tracks.csv")
+    # Save to Parquet
+    success = save_to_csv(df, "day2_test_tracks.parquet")
     
     if success:
         print("\n📊 Sample data:")
@@ -128,16 +170,14 @@ class SpotifyExtractor:
     def _setup_spotify(self):
         """Set up Spotify client"""
         try:
-            import certifi
-            import requests
-            session = requests.Session()
-            session.verify = certifi.where()
+            session = build_session()
             
             sp_oauth = SpotifyOAuth(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
                 redirect_uri=self.redirect_uri,
                 scope=self.scope,
+                cache_handler=CacheFileHandler(cache_path=TOKEN_CACHE_PATH),
                 requests_session=session
             )
             
@@ -150,7 +190,7 @@ class SpotifyExtractor:
                 code = sp_oauth.parse_response_code(response)
                 token_info = sp_oauth.get_access_token(code)
             
-            self.sp = spotipy.Spotify(auth=token_info['access_token'], requests_session=False)
+            self.sp = spotipy.Spotify(auth=token_info['access_token'], requests_session=session)
             print("✅ Spotify client ready!")
             
         except Exception as e:
@@ -167,36 +207,19 @@ class SpotifyExtractor:
             
             results = self.sp.current_user_recently_played(limit=limit)
             
-            tracks_data = []
-            for item in results['items']:
-                track = item['track']
-                played_at = item['played_at']
-                
-                track_info = {
-                    'track_id': track['id'],
-                    'track_name': track['name'],
-                    'artist_name': track['artists'][0]['name'],
-                    'artist_id': track['artists'][0]['id'],
-                    'album_name': track['album']['name'],
-                    'album_id': track['album']['id'],
-                    'played_at': played_at,
-                    'duration_ms': track['duration_ms'],
-                    'popularity': track['popularity'],
-                    'explicit': track['explicit']
-                }
-                tracks_data.append(track_info)
+            df = build_tracks_df(results['items'])
             
-            print(f"✅ Retrieved {len(tracks_data)} tracks")
-            return pd.DataFrame(tracks_data)
+            print(f"✅ Retrieved {len(df)} tracks")
+            return df
             
         except Exception as e:
             print(f"❌ Failed to get recent tracks: {e}")
             return None
     
     def save_to_csv(self, df, filename="recent_tracks.csv"):
-        """Save DataFrame to CSV file"""
+        """Save DataFrame to a file (CSV, or Parquet/Feather by extension)"""
         if df is not None and not df.empty:
-            df.to_csv(filename, index=False)
+            write_tracks(df, filename)
             print(f"✅ Saved {len(df)} tracks to {filename}")
         else:
             print("❌ No data to save")
@@ -217,8 +240,8 @@ def test_extractor():
             print("\n📊 Sample data:")
             print(df[['track_name', 'artist_name', 'played_at']].head())
             
-            # Save to CSV
-            extractor.save_to_csv(df, "day2_test_tracks.csv")
+            # Save to Parquet
+            extractor.save_to_csv(df, "day2_test_tracks.parquet")
             
             return True
         else:
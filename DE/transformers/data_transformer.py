@@ -4,6 +4,7 @@ Features: Data cleaning, validation, normalization, feature engineering
 Production-ready with comprehensive quality control
 """
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
 import numpy as np
 from datetime import datetime, timezone
 import logging
@@ -79,8 +80,8 @@ class SpotifyDataTransformer:
         logger.info(f"🎵 Cleaning {len(df)} audio feature records...")
         
         try:
-            # Create a copy and apply existing normalization
-            cleaned_df = df.copy()
+            # Shallow copy (data shared until a column is reassigned), then apply existing normalization
+            cleaned_df = df.copy(deep=False)
             
             # Rename 'id' to 'track_id' if needed
             if 'id' in cleaned_df.columns and 'track_id' not in cleaned_df.columns:
@@ -117,7 +118,7 @@ class SpotifyDataTransformer:
         logger.info(f"👤 Cleaning {len(df)} artist records...")
         
         try:
-            cleaned_df = df.copy()
+            cleaned_df = df.copy(deep=False)  # Columns are only ever reassigned, never written in place
             
             # Remove duplicates
             if 'artist_id' in cleaned_df.columns:
@@ -212,38 +213,49 @@ class SpotifyDataTransformer:
         logger.info("Cleaning text fields...")
         
         text_columns = ['track_name', 'artist_name', 'album_name']
-        df_cleaned = df.copy()
+        # Shallow copy: only the cleaned text columns are replaced, the rest stay shared with df
+        df_cleaned = df.copy(deep=False)
         
         for col in text_columns:
             if col in df_cleaned.columns:
-                # Handle None values first
-                df_cleaned[col] = df_cleaned[col].fillna('')
-                
-                # Convert to string type
-                df_cleaned[col] = df_cleaned[col].astype(str)
-                
-                # Remove extra whitespace
-                df_cleaned[col] = df_cleaned[col].str.strip()
-                
-                # Remove special characters that cause database issues
-                df_cleaned[col] = df_cleaned[col].str.replace(r'[^\w\s\-\'\(\)\&]', '', regex=True)
-                
                 # Limit length to prevent database issues
                 max_length = 200 if col != 'track_name' else 300
-                df_cleaned[col] = df_cleaned[col].str[:max_length]
                 
-                # Handle empty strings
-                df_cleaned[col] = df_cleaned[col].replace('', np.nan)
+                if isinstance(df_cleaned[col].dtype, pd.CategoricalDtype):
+                    # Categorical (extractor's compact dtype): clean each distinct value once
+                    categories = df_cleaned[col].cat.categories
+                    cleaned = self._clean_text(pd.Series(categories, dtype=object), max_length)
+                    df_cleaned[col] = df_cleaned[col].map(dict(zip(categories, cleaned)))
+                else:
+                    df_cleaned[col] = self._clean_text(df_cleaned[col], max_length)
         
         return df_cleaned
     
+    @staticmethod
+    def _clean_text(values: pd.Series, max_length: int) -> pd.Series:
+        """Strip, drop special characters, truncate; missing or empty values become NaN"""
+        # Handle None values first, then convert to string type
+        values = values.fillna('').astype(str)
+        
+        # Remove extra whitespace
+        values = values.str.strip()
+        
+        # Remove special characters that cause database issues
+        values = values.str.replace(r'[^\w\s\-\'\(\)\&]', '', regex=True)
+        
+        values = values.str[:max_length]
+        
+        # Handle empty strings
+        return values.replace('', np.nan)
+    
     def normalize_timestamps(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normalize timestamp formats and handle NaT properly"""
         logger.info("Normalizing timestamps...")
         
         if 'played_at' in df.columns:
-            # Convert to datetime, coerce errors to NaT
-            df['played_at'] = pd.to_datetime(df['played_at'], utc=True, errors='coerce')
+            # Convert to datetime, coerce errors to NaT (already parsed when it comes from the extractor)
+            if not is_datetime64_any_dtype(df['played_at']):
+                df['played_at'] = pd.to_datetime(df['played_at'], format='ISO8601', utc=True, errors='coerce', cache=True)
             
             # Create additional time-based features (only for non-NaT values)
             df['played_date'] = df['played_at'].dt.date
@@ -253,7 +265,8 @@ class SpotifyDataTransformer:
         
         # Handle added_at timestamp (from playlists)
         if 'added_at' in df.columns:
-            df['added_at'] = pd.to_datetime(df['added_at'], utc=True, errors='coerce')
+            if not is_datetime64_any_dtype(df['added_at']):
+                df['added_at'] = pd.to_datetime(df['added_at'], format='ISO8601', utc=True, errors='coerce', cache=True)
         
         # Handle release dates
         if 'release_date' in df.columns:
@@ -389,6 +402,9 @@ class SpotifyDataTransformer:
         categorical_columns = ['album_type', 'mood_category', 'duration_category']
         for col in categorical_columns:
             if col in df.columns:
+                # Categorical dtypes (from the extractor) need the fill value registered first
+                if isinstance(df[col].dtype, pd.CategoricalDtype) and 'Unknown' not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories('Unknown')
                 df[col] = df[col].fillna('Unknown')
         
         return df
@@ -568,8 +584,9 @@ def test_transformer():
         print("    No missing values found")
     
     # Save enhanced test results
-    output_file = 'enhanced_day3_transformation_test.csv'
-    transformed_df.to_csv(output_file, index=False)
+    # Parquet keeps the datetime/categorical dtypes the transform just computed
+    output_file = 'enhanced_day3_transformation_test.parquet'
+    transformed_df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
     print(f"\n💾 Saved enhanced test results to: {output_file}")
     
     print("\n All enhanced transformer tests completed successfully!")
@@ -64,4 +64,15 @@ CREATE INDEX IF NOT EXISTS idx_listening_history_played_at
 ON listening_history(played_at);
 
 CREATE INDEX IF NOT EXISTS idx_listening_history_track_id 
-ON listening_history(track_id);
\ No newline at end of file
+ON listening_history(track_id);
+
+-- One row per play: lets the loader insert with ON CONFLICT (track_id, played_at) DO NOTHING.
+-- Existing databases keep their first copy of any duplicated play before the index is built.
+DELETE FROM listening_history a
+USING listening_history b
+WHERE a.track_id = b.track_id
+  AND a.played_at = b.played_at
+  AND a.id > b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_listening_history_track_played
+ON listening_history(track_id, played_at);
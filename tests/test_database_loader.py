@@ -0,0 +1,162 @@
+"""
+Database loader tests - load methods run against a mocked psycopg2 connection
+"""
+import sys
+from pathlib import Path
+import datetime as dt
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import DE.loaders.database_loader as database_loader
+from DE.loaders.database_loader import SpotifyDatabaseLoader
+
+
+class FakeCursor:
+    """Records executed SQL; answers the index probe and the existing-plays fetch"""
+    
+    def __init__(self, has_unique_index=True, existing_plays=()):
+        self.has_unique_index = has_unique_index
+        self.existing_plays = list(existing_plays)
+        self.queries = []
+        self.copied = ''
+
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    rowcount = 0
+    
+    def execute(self, query, params=None):
+        self.queries.append(' '.join(query.split()))
+        if query.lstrip().startswith('INSERT'):
+            self.rowcount = len(self.copied.splitlines())
+    
+    def copy_expert(self, query, buffer):
+        self.queries.append(query)
+        data = buffer.getvalue()
+        self.copied = data.decode() if isinstance(data, bytes) else data
+    
+    def fetchone(self):
+        return (self.has_unique_index,)
+    
+    def fetchall(self):
+        return self.existing_plays
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+    
+    def cursor(self):
+        return self._cursor
+    
+    def commit(self):
+        self.committed = True
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    """Capture execute_values calls; each returns one RETURNING row per inserted tuple"""
+    calls = []
+    
+    def fake_execute_values(cursor, query, rows, page_size=100, fetch=False):
+        calls.append((' '.join(query.split()), list(rows)))
+        return [(1,)] * len(rows)
+    
+    monkeypatch.setattr(database_loader, 'execute_values', fake_execute_values)
+    return calls
+
+
+def make_loader(monkeypatch, cursor):
+    """A loader built through __init__, with the database setup and connection mocked"""
+    monkeypatch.setattr(SpotifyDatabaseLoader, '_setup_database', lambda self: None)
+    loader = SpotifyDatabaseLoader()
+    connection = FakeConnection(cursor)
+    loader.get_connection = lambda: connection
+    return loader, connection
+
+
+def history_frame():
+    return pd.DataFrame({
+        'track_id': ['t1', 't2', 't2'],
+        'played_at': pd.to_datetime(['2024-01-01 10:00', '2024-01-01 11:00', '2024-01-01 11:00'], utc=True),
+    })
+
+
+def test_load_listening_history_with_unique_index(monkeypatch, inserted):
+    cursor = FakeCursor(has_unique_index=True)
+    loader, connection = make_loader(monkeypatch, cursor)
+    
+    assert loader.load_listening_history(history_frame()) == 3
+    assert connection.committed
+    assert 'pg_indexes' in cursor.queries[0]
+    query, rows = inserted[0]
+    assert 'ON CONFLICT (track_id, played_at) DO NOTHING' in query
+    assert len(rows) == 3
+    
+    # The probe result is kept: a second load doesn't query pg_indexes again
+    cursor.queries.clear()
+    loader.load_listening_history(history_frame())
+    assert not any('pg_indexes' in q for q in cursor.queries)
+
+
+def test_load_listening_history_without_unique_index(monkeypatch, inserted):
+    cursor = FakeCursor(has_unique_index=False, existing_plays=[('t1', dt.datetime(2024, 1, 1, 10, 0))])
+    loader, connection = make_loader(monkeypatch, cursor)
+    
+    # t1 is already stored and t2 is repeated in the frame: only one new play is inserted
+    assert loader.load_listening_history(history_frame()) == 1
+    assert any('WHERE (track_id, played_at) IN' in q for q in cursor.queries)
+    query, rows = inserted[0]
+    assert 'ON CONFLICT' not in query
+    assert [row[0] for row in rows] == ['t2']
+
+
+def tracks_frame():
+    return pd.DataFrame({
+        'track_id': ['t1', 't2', 't1'],
+        'name': ['First', 'Second', 'First (remaster)'],
+        'popularity': [10, 20, 30],
+    })
+
+
+def test_upsert_data_returns_upserted_row_count(monkeypatch, inserted):
+    cursor = FakeCursor()
+    loader, connection = make_loader(monkeypatch, cursor)
+    
+    # Duplicate keys keep the last row, so t1 and t2 are upserted once each
+    assert loader._upsert_data(tracks_frame(), 'tracks', ['track_id'], ['name', 'popularity']) == 2
+    assert connection.committed
+    query, rows = inserted[0]
+    assert query.startswith('INSERT INTO tracks (track_id, name, popularity) VALUES %s')
+    assert 'ON CONFLICT (track_id) DO UPDATE SET name = EXCLUDED.name' in query
+    assert sorted(rows) == [('t1', 'First (remaster)', 30), ('t2', 'Second', 20)]
+    
+    # The statement is built once and reused for the same table layout
+    assert loader._upsert_data(tracks_frame(), 'tracks', ['track_id'], ['name', 'popularity']) == 2
+    assert len(loader._upsert_sql_cache) == 1
+
+
+def test_upsert_data_stages_large_loads_with_copy(monkeypatch, inserted):
+    cursor = FakeCursor()
+    loader, _ = make_loader(monkeypatch, cursor)
+    loader.copy_threshold = 2
+    
+    assert loader._upsert_data(tracks_frame(), 'tracks', ['track_id'], ['name', 'popularity']) == 2
+    assert not inserted
+    assert any(q.startswith('COPY _stage_tracks (track_id, name, popularity) FROM STDIN') for q in cursor.queries)
+    assert any(q.startswith('INSERT INTO tracks (track_id, name, popularity) SELECT') for q in cursor.queries)
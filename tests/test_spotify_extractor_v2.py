@@ -0,0 +1,105 @@
+"""
+Spotify extractor v2 tests - cleaning, dedupe, async shutdown and Parquet streaming run without Spotify credentials
+"""
+import sys
+import threading
+from pathlib import Path
+import httpx
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from DE.extractors.spotify_extractor_v2 import SpotifyExtractorV2, write_parquet_stream
+
+
+def make_extractor():
+    """Extractor without authentication; only the validation state is set up"""
+    extractor = SpotifyExtractorV2.__new__(SpotifyExtractorV2)
+    extractor._validation_plans = {}
+    return extractor
+
+
+def make_tracks(track_ids):
+    return pd.DataFrame({
+        'track_id': track_ids,
+        'track_name': ['Song'] * len(track_ids),
+        'played_at': ['2024-01-15T10:30:00.000Z'] * len(track_ids),
+        'popularity': [50] + [None] * (len(track_ids) - 1),
+    })
+
+
+def test_validate_data_leaves_input_unchanged():
+    df = make_tracks(['a', 'b'])
+    original = df.copy()
+
+    cleaned = make_extractor().validate_data(df)
+
+    assert len(cleaned) == 2
+    assert str(cleaned['played_at'].dtype).startswith('datetime64')
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_drop_duplicate_plays_returns_own_frame_without_duplicates():
+    df = make_tracks(['a', 'b'])
+
+    deduplicated = SpotifyExtractorV2._drop_duplicate_plays(df)
+    deduplicated['track_name'] = 'Changed'
+
+    assert deduplicated is not df
+    assert (df['track_name'] == 'Song').all()
+
+
+def test_filter_new_plays_keeps_first_play_per_track_and_time():
+    items = [
+        {'track': {'id': 'a'}, 'played_at': '2024-01-15T10:30:00.000Z'},
+        {'track': {'id': 'a'}, 'played_at': '2024-01-15T10:30:00.000Z'},
+        {'track': {'id': 'a'}, 'played_at': '2024-01-15T10:35:00.000Z'},
+    ]
+    seen_plays = set()
+
+    new_items = SpotifyExtractorV2._filter_new_plays(items, seen_plays)
+
+    assert new_items == [items[0], items[2]]
+    assert seen_plays == {('a', '2024-01-15T10:30:00.000Z'), ('a', '2024-01-15T10:35:00.000Z')}
+
+
+def test_close_shuts_down_async_client_and_loop():
+    extractor = make_extractor()
+    extractor._async_loop = extractor._async_thread = extractor._async_client = None
+    extractor._async_loop_lock = threading.Lock()
+    extractor.max_concurrent_requests = 2
+    extractor.http_timeout = httpx.Timeout(1.0)
+    extractor.http_limits = httpx.Limits(max_connections=2)
+    extractor._get_access_token = lambda: 'token'
+
+    assert extractor._run_gather([]) == []
+    loop, thread, client = extractor._async_loop, extractor._async_thread, extractor._async_client
+
+    extractor.close()
+    extractor.close()  # Idempotent
+
+    assert client.is_closed
+    assert not thread.is_alive()
+    assert loop.is_closed()
+    assert extractor._async_loop is None
+
+
+def test_write_parquet_stream_accepts_wider_later_chunks(tmp_path):
+    small = pd.DataFrame({
+        'track_id': pd.Categorical(['a', 'b', 'c']),
+        'preview_url': [None] * 3,
+    })
+    large = pd.DataFrame({
+        'track_id': pd.Categorical([f't{i}' for i in range(300)]),
+        'preview_url': pd.array(['https://p.scdn.co/mp3-preview/x'] * 300, dtype='string[pyarrow]'),
+    })
+    output_file = tmp_path / 'tracks.parquet'
+
+    rows_written = write_parquet_stream([small, large], str(output_file))
+
+    written = pd.read_parquet(output_file)
+    assert rows_written == len(written) == 303
+    assert written['track_id'].iloc[-1] == 't299'
+    assert written['preview_url'].isna().sum() == 3